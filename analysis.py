@@ -2,6 +2,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import database
+import stats
 from pathlib import Path
 import os
 
@@ -11,24 +12,29 @@ GRAPHS_DIR = OUTPUT_DIR / "graphs"
 def ensure_dirs():
     GRAPHS_DIR.mkdir(parents=True, exist_ok=True)
 
-def load_data():
+def load_data(course_id: str = None):
     conn = database.get_connection()
     # Join courses, sections, evaluations
     query = """
         SELECT 
             c.filename, c.source, 
-            s.section_index, 
+            s.id AS section_id, s.section_index, 
+            e.id AS evaluation_id, e.model_name,
             e.rubric1, e.rubric2, e.rubric3, e.rubric4, e.rubric5, e.rubric6, e.rubric7
         FROM evaluations e
         JOIN sections s ON e.section_id = s.id
         JOIN courses c ON s.course_id = c.id
     """
-    df = pd.read_sql_query(query, conn)
+    params = ()
+    if course_id:
+        query += " WHERE c.id = ?"
+        params = (course_id,)
+    df = pd.read_sql_query(query, conn, params=params)
     conn.close()
     return df
 
 def generate_radar_chart(df: pd.DataFrame, filename: str):
-    """Generate radar chart for a single course (average rubrics)."""
+    """Generate radar chart for a single course (average rubrics), one line per model."""
     # Filter for the specific course filename
     course_df = df[df['filename'] == filename]
     if course_df.empty:
@@ -38,23 +44,25 @@ def generate_radar_chart(df: pd.DataFrame, filename: str):
     categories = ['Goal Focus', 'Readability', 'Clarity', 'Prerequisites', 'Fluidity', 'Examples (Conc)', 'Examples (Cohere)']
     rubrics = ['rubric1', 'rubric2', 'rubric3', 'rubric4', 'rubric5', 'rubric6', 'rubric7']
     
-    values = course_df[rubrics].mean().values.tolist()
-    if not values or np.isnan(values).any():
+    means = course_df.groupby('model_name')[rubrics].mean().dropna()
+    if means.empty:
         return
-        
-    values += values[:1] # Close the loop
     
     angles = [n / float(len(categories)) * 2 * np.pi for n in range(len(categories))]
     angles += angles[:1]
     
     fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
-    ax.plot(angles, values, linewidth=1, linestyle='solid')
-    ax.fill(angles, values, 'b', alpha=0.1)
+    for model_name, row in means.iterrows():
+        values = row.values.tolist()
+        values += values[:1] # Close the loop
+        line, = ax.plot(angles, values, linewidth=1, linestyle='solid', label=model_name)
+        ax.fill(angles, values, color=line.get_color(), alpha=0.1)
     
     ax.set_xticks(angles[:-1])
     ax.set_xticklabels(categories)
     ax.set_yticks([2, 4, 6, 8, 10])
     ax.set_ylim(0, 10)
+    ax.legend(loc='lower right', bbox_to_anchor=(1.1, -0.1))
     
     plt.title(f"Course Analysis: {filename}")
     plt.tight_layout()
@@ -66,20 +74,34 @@ def generate_radar_chart(df: pd.DataFrame, filename: str):
     print(f"Generated radar chart: {out_path}")
 
 def generate_source_boxplot(df: pd.DataFrame):
-    """Generate boxplot comparing sources."""
+    """Generate boxplot comparing sources, one box per source and model."""
     if df.empty or 'source' not in df.columns:
         return
 
-    # Melt dataframe to long format for boxplot
+    # One box per (source, model) so different models are never pooled together
     rubrics = ['rubric1', 'rubric2', 'rubric3', 'rubric4', 'rubric5', 'rubric6', 'rubric7']
-    long_df = df.melt(id_vars=['source'], value_vars=rubrics, var_name='Rubric', value_name='Score')
+    df = df.assign(group=df['source'] + "\n" + df['model_name'])
+
+    # Melt dataframe to long format for boxplot
+    long_df = df.melt(id_vars=['group'], value_vars=rubrics, var_name='Rubric', value_name='Score')
     
     plt.figure(figsize=(12, 6))
-    long_df.boxplot(column='Score', by='source', grid=False)
-    plt.title('Score Distribution by Source')
+    long_df.boxplot(column='Score', by='group', grid=False)
+
+    # Overlay each mean with its bootstrap 95% CI (boxes are drawn in sorted group order).
+    # The 7 scores of an evaluation are correlated, so resample evaluations (their mean score), not single scores.
+    rng = np.random.default_rng(stats.SEED)
+    for pos, (group, group_df) in enumerate(df.groupby('group'), start=1):
+        mean, low, high = stats.bootstrap_ci(group_df[rubrics].mean(axis=1).to_numpy(dtype=float), rng=rng)
+        if np.isnan(mean):
+            continue
+        plt.errorbar(pos, mean, yerr=[[mean - low], [high - mean]], fmt='D', color='red', capsize=6,
+                     label='Mean (95% CI)' if pos == 1 else None)
+    plt.legend(loc='lower right')
+    plt.title('Score Distribution by Source and Model')
     plt.suptitle('') # Suppress default title
     plt.ylabel('Score (1-10)')
-    plt.xlabel('Source')
+    plt.xlabel('Source / Model')
     
     out_path = GRAPHS_DIR / "source_comparison_boxplot.png"
     plt.savefig(out_path)
@@ -87,9 +109,10 @@ def generate_source_boxplot(df: pd.DataFrame):
     print(f"Generated boxplot: {out_path}")
 
 def generate_heatmap(df: pd.DataFrame):
-     # Pivot table: Index=Filename, Columns=Rubric, Values=Mean Score
+     # Pivot table: Index=Filename (Model), Columns=Rubric, Values=Mean Score
     rubrics = ['rubric1', 'rubric2', 'rubric3', 'rubric4', 'rubric5', 'rubric6', 'rubric7']
-    pivot = df.groupby('filename')[rubrics].mean()
+    pivot = df.groupby(['filename', 'model_name'])[rubrics].mean()
+    pivot.index = [f"{filename} ({model_name})" for filename, model_name in pivot.index]
     
     if pivot.empty:
         return
@@ -127,7 +150,38 @@ def run_analysis():
     generate_source_boxplot(df)
     generate_heatmap(df)
     
-    # Save raw aggregates
+    # Save raw aggregates (per model, so Claude and Gemini scores are not averaged together)
     agg_path = OUTPUT_DIR / "aggregates.csv"
-    df.groupby('filename').mean(numeric_only=True).to_csv(agg_path)
+    df.groupby(['filename', 'model_name'])[stats.RUBRICS].mean().to_csv(agg_path)
     print(f"Saved aggregates to {agg_path}")
+
+    generate_statistics(df)
+
+def generate_statistics(df: pd.DataFrame):
+    """Bootstrap confidence intervals for course/source means and inter-model agreement."""
+    print("Computing bootstrap confidence intervals...")
+    ci = pd.concat([
+        stats.group_confidence_intervals(df, ['filename', 'model_name']).rename(columns={'filename': 'name'}).assign(level='course'),
+        stats.group_confidence_intervals(df, ['source', 'model_name']).rename(columns={'source': 'name'}).assign(level='source'),
+    ], ignore_index=True)
+    ci_path = OUTPUT_DIR / "confidence_intervals.csv"
+    ci[['level', 'name', 'model_name', 'rubric', 'n', 'mean', 'ci_low', 'ci_high']].to_csv(ci_path, index=False)
+    print(f"Saved confidence intervals to {ci_path}")
+
+    agreement = stats.model_agreement(df)
+    if agreement.empty:
+        print("Only one model found, skipping inter-model agreement.")
+        return
+    agreement_path = OUTPUT_DIR / "agreement.csv"
+    agreement.to_csv(agreement_path, index=False)
+    print(f"Saved inter-model agreement to {agreement_path}")
+
+def run_course_analysis(course_id: str):
+    """Regenerate only the charts of a single course (used by the watch mode)."""
+    ensure_dirs()
+    df = load_data(course_id)
+    if df.empty:
+        print(f"No evaluation data found for course {course_id}.")
+        return
+    for filename in df['filename'].unique():
+        generate_radar_chart(df, filename)
@@ -14,10 +14,39 @@ def get_connection():
 def init_db():
     """Initialize the database with the schema."""
     conn = get_connection()
+    has_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sections_fts'"
+    ).fetchone() is not None
     with open(SCHEMA_PATH, "r") as f:
         conn.executescript(f.read())
     conn.commit()
     conn.close()
+    # Databases created before the search index existed: backfill it once
+    if not has_index:
+        rebuild_search_index()
+
+def rebuild_search_index():
+    """Rebuild the full-text index from the sections and evaluations tables."""
+    conn = get_connection()
+    try:
+        conn.execute("INSERT INTO sections_fts(sections_fts) VALUES ('rebuild')")
+        conn.execute("DELETE FROM evaluations_fts")
+        conn.execute("""
+            INSERT INTO evaluations_fts(rowid, issues, fixes, evidence, reasoning)
+            SELECT
+                e.id,
+                (SELECT group_concat(value, char(10)) FROM json_each(e.issues)),
+                (SELECT group_concat(value, char(10)) FROM json_each(e.fixes)),
+                (SELECT group_concat(value, char(10)) FROM json_each(e.evidence)),
+                (SELECT group_concat(value, char(10)) FROM json_each(e.reasoning))
+            FROM evaluations e
+        """)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
 
 def course_exists(course_id: str) -> bool:
     conn = get_connection()
@@ -53,8 +82,8 @@ def insert_sections(course_id: str, sections: List[str]):
     finally:
         conn.close()
 
-def get_unevaluated_sections(model_name: str) -> List[Dict[str, Any]]:
-    """Get sections that have not been evaluated by the specified model."""
+def get_unevaluated_sections(model_name: str, course_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get sections that have not been evaluated by the specified model, optionally for a single course."""
     conn = get_connection()
     query = """
         SELECT s.id, s.content, c.filename
@@ -63,7 +92,11 @@ def get_unevaluated_sections(model_name: str) -> List[Dict[str, Any]]:
         LEFT JOIN evaluations e ON s.id = e.section_id AND e.model_name = ?
         WHERE e.id IS NULL
     """
-    cursor = conn.execute(query, (model_name,))
+    params = [model_name]
+    if course_id:
+        query += " AND c.id = ?"
+        params.append(course_id)
+    cursor = conn.execute(query, params)
     rows = [dict(row) for row in cursor.fetchall()]
     conn.close()
     return rows
@@ -135,3 +168,130 @@ def get_all_courses() -> List[Dict[str, Any]]:
     rows = [dict(row) for row in conn.execute("SELECT * FROM courses").fetchall()]
     conn.close()
     return rows
+
+def get_course(course_id: str) -> Optional[Dict[str, Any]]:
+    conn = get_connection()
+    row = conn.execute("SELECT * FROM courses WHERE id = ?", (course_id,)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def course_needs_report(course_id: str) -> bool:
+    """True if the course has evaluations and no synthesis yet, or evaluations newer than its synthesis."""
+    conn = get_connection()
+    row = conn.execute("""
+        SELECT MAX(e.created_at) AS last_evaluation, syn.created_at AS synthesized_at
+        FROM sections s
+        JOIN evaluations e ON e.section_id = s.id
+        LEFT JOIN synthesis syn ON syn.course_id = s.course_id
+        WHERE s.course_id = ?
+    """, (course_id,)).fetchone()
+    conn.close()
+    if row["last_evaluation"] is None:
+        return False
+    return row["synthesized_at"] is None or row["last_evaluation"] > row["synthesized_at"]
+
+def get_stale_courses(filepath: str, current_id: str) -> List[Dict[str, Any]]:
+    """Get older versions of a course: same file path, different content hash."""
+    conn = get_connection()
+    rows = [dict(row) for row in conn.execute(
+        "SELECT * FROM courses WHERE filepath = ? AND id != ?", (filepath, current_id)
+    ).fetchall()]
+    conn.close()
+    return rows
+
+def delete_course(course_id: str) -> int:
+    """
+    Delete a course with its sections, evaluations and synthesis (foreign keys are not enforced, so cascade by hand).
+    Returns the number of deleted evaluations.
+    """
+    conn = get_connection()
+    try:
+        deleted = conn.execute(
+            "DELETE FROM evaluations WHERE section_id IN (SELECT id FROM sections WHERE course_id = ?)",
+            (course_id,)
+        ).rowcount
+        conn.execute("DELETE FROM sections WHERE course_id = ?", (course_id,))
+        conn.execute("DELETE FROM synthesis WHERE course_id = ?", (course_id,))
+        conn.execute("DELETE FROM courses WHERE id = ?", (course_id,))
+        conn.commit()
+        return deleted
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+def _search_filters(source: Optional[str], model_name: Optional[str], rubric: Optional[int],
+                    min_score: Optional[float], max_score: Optional[float]):
+    """Build the WHERE clauses shared by the search queries. `rubric` is 1-7."""
+    clauses, params = [], []
+    if source:
+        clauses.append("c.source = ?")
+        params.append(source)
+    if model_name:
+        clauses.append("e.model_name = ?")
+        params.append(model_name)
+    if rubric is not None:
+        column = f"e.rubric{int(rubric)}"
+        if min_score is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append(f"{column} <= ?")
+            params.append(max_score)
+    return clauses, params
+
+def search_sections(query: str, source: Optional[str] = None, model_name: Optional[str] = None,
+                    rubric: Optional[int] = None, min_score: Optional[float] = None,
+                    max_score: Optional[float] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """Full-text search over section content, best matches first (bm25)."""
+    conn = get_connection()
+    sql = """
+        SELECT s.id AS section_id, s.section_index, c.filename, c.source,
+               snippet(sections_fts, 0, '[', ']', '...', 16) AS snippet,
+               bm25(sections_fts) AS rank
+        FROM sections_fts
+        JOIN sections s ON s.id = sections_fts.rowid
+        JOIN courses c ON c.id = s.course_id
+        WHERE sections_fts MATCH ?
+    """
+    params: List[Any] = [query]
+    if source:
+        sql += " AND c.source = ?"
+        params.append(source)
+    # Model and score filters apply to the evaluations of the section
+    eval_clauses, eval_params = _search_filters(None, model_name, rubric, min_score, max_score)
+    if eval_clauses:
+        sql += " AND EXISTS (SELECT 1 FROM evaluations e WHERE e.section_id = s.id AND " + " AND ".join(eval_clauses) + ")"
+        params.extend(eval_params)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+    conn.close()
+    return rows
+
+def search_evaluations(query: str, source: Optional[str] = None, model_name: Optional[str] = None,
+                       rubric: Optional[int] = None, min_score: Optional[float] = None,
+                       max_score: Optional[float] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """Full-text search over evaluation findings (issues, fixes, evidence, reasoning), best matches first (bm25)."""
+    conn = get_connection()
+    sql = """
+        SELECT e.id AS evaluation_id, e.section_id, e.model_name, s.section_index, c.filename, c.source,
+               snippet(evaluations_fts, -1, '[', ']', '...', 16) AS snippet,
+               bm25(evaluations_fts) AS rank
+        FROM evaluations_fts
+        JOIN evaluations e ON e.id = evaluations_fts.rowid
+        JOIN sections s ON s.id = e.section_id
+        JOIN courses c ON c.id = s.course_id
+        WHERE evaluations_fts MATCH ?
+    """
+    params: List[Any] = [query]
+    clauses, filter_params = _search_filters(source, model_name, rubric, min_score, max_score)
+    for clause in clauses:
+        sql += f" AND {clause}"
+    params.extend(filter_params)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+    conn.close()
+    return rows
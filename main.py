@@ -1,10 +1,14 @@
 import argparse
+import os
+import re
 import sys
+import sqlite3
 from pathlib import Path
 import database
 import pipeline
 import llm
 import analysis
+import watcher
 
 def cmd_ingest(args):
     print("Initializing Database...")
@@ -22,25 +26,7 @@ def cmd_evaluate(args):
     sections = database.get_unevaluated_sections(model_name)
     print(f"Found {len(sections)} sections to evaluate.")
     
-    limit = args.limit
-    count = 0
-    
-    import time
-    for section in sections:
-        if limit and count >= limit:
-            break
-            
-        print(f"Evaluating section {section['id']} of {section['filename']}...")
-        result = llm.evaluate_section(section['content'], preferred_model=model_name)
-        
-        if result:
-            database.save_evaluation(section['id'], model_name, result)
-            count += 1
-            print("  -> Saved.")
-        else:
-            print("  -> Failed / Skipped.")
-        
-        time.sleep(2)
+    pipeline.evaluate_sections(sections, model_name, limit=args.limit)
 
 def cmd_report(args):
     print("Generating reports...")
@@ -64,22 +50,56 @@ def cmd_synthesize(args):
     print("Synthesizing reports for all courses...")
     courses = database.get_all_courses()
     for course in courses:
-        print(f"Synthesizing {course["filename"]}...")
-        evals = database.get_course_evaluations(course["id"])
-        if not evals:
-            print(f"  -> No evaluations found for {course["filename"]}. Skip.")
-            continue
-        
-        report = llm.synthesize_course_report(evals, model_name=args.model)
-        if report:
-            database.save_synthesis(course["id"], args.model, report)
-            # Also save to disk
-            out_path = Path("outputs") / f"{course["filename"].replace(".pdf", "")}_synthesis.md"
-            with open(out_path, "w") as f_out:
-                f_out.write(report)
-            print(f"  -> Saved to DB and {out_path}")
-        else:
-            print("  -> Synthesis failed.")
+        pipeline.synthesize_course(course, args.model)
+
+def cmd_serve(args):
+    watcher.serve(
+        Path(args.courses_dir),
+        watch=args.watch,
+        model_name=args.model,
+        semantic=not args.no_semantic,
+        queue_size=args.queue_size,
+        poll_interval=args.interval,
+        settle=args.settle,
+    )
+
+# Column filters only exist in one index: "issues: jargon" or "{fixes evidence}: example" in the
+# findings one, "content: python" in the sections one. With --scope all, search only the matching index.
+FINDINGS_COLUMN_FILTER = re.compile(r"(\b(issues|fixes|evidence|reasoning)\s*:|\{[^}]*\}\s*:)", re.I)
+SECTIONS_COLUMN_FILTER = re.compile(r"\bcontent\s*:", re.I)
+
+def cmd_search(args):
+    database.init_db()
+    filters = dict(
+        source=args.source, model_name=args.model, rubric=args.rubric,
+        min_score=args.min_score, max_score=args.max_score, limit=args.limit,
+    )
+    scopes = ["sections", "findings"] if args.scope == "all" else [args.scope]
+    if args.scope == "all" and FINDINGS_COLUMN_FILTER.search(args.query):
+        scopes = ["findings"]
+    elif args.scope == "all" and SECTIONS_COLUMN_FILTER.search(args.query):
+        scopes = ["sections"]
+
+    errors = []
+    for scope in scopes:
+        try:
+            if scope == "sections":
+                results = database.search_sections(args.query, **filters)
+                print(f"Sections ({len(results)}):")
+                for r in results:
+                    print(f"  [{r['source']}] {r['filename']} #{r['section_index']} (rank {r['rank']:.2f})")
+                    print(f"      {' '.join(r['snippet'].split())}")
+            else:
+                results = database.search_evaluations(args.query, **filters)
+                print(f"Findings ({len(results)}):")
+                for r in results:
+                    print(f"  [{r['source']}] {r['filename']} #{r['section_index']} - {r['model_name']} (rank {r['rank']:.2f})")
+                    print(f"      {' '.join(r['snippet'].split())}")
+        except sqlite3.OperationalError as e:
+            if str(e) not in errors:
+                errors.append(str(e))
+    for error in errors:
+        print(f"Invalid search query: {error}")
 
 def main():
     parser = argparse.ArgumentParser(description="Course Analysis Engine")
@@ -105,7 +125,31 @@ def main():
     # Synthesize
     parser_synth = subparsers.add_parser("synthesize", help="Generate a high-level course synthesis")
     parser_synth.add_argument("--model", default="claude", help="Model to use")
+
+    # Serve
+    parser_serve = subparsers.add_parser("serve", help="Stream PDFs through ingest -> evaluate -> report")
+    parser_serve.add_argument("--watch", action="store_true", help="Keep running and process new or changed PDFs")
+    parser_serve.add_argument("--courses-dir", default=os.getenv("COURSES_DIR", "./courses"), help="Directory containing PDFs")
+    parser_serve.add_argument("--model", default="claude", help="Model to use (claude/gemini)")
+    parser_serve.add_argument("--no-semantic", action="store_true", help="Disable semantic segmentation")
+    parser_serve.add_argument("--queue-size", type=int, default=8, help="Max items waiting between two stages")
+    parser_serve.add_argument("--interval", type=float, default=5.0, help="Polling interval in seconds (without inotify)")
+    parser_serve.add_argument("--settle", type=float, default=2.0, help="Seconds a file must stay unchanged before ingestion")
+
+    # Search
+    parser_search = subparsers.add_parser("search", help="Full-text search over sections and evaluation findings")
+    parser_search.add_argument("query", help="FTS5 query, e.g. 'jargon' or 'fixes: example*'")
+    parser_search.add_argument("--scope", choices=["all", "sections", "findings"], default="all", help="What to search")
+    parser_search.add_argument("--source", default=None, help="Only courses from this source")
+    parser_search.add_argument("--model", default=None, help="Only evaluations from this model")
+    parser_search.add_argument("--rubric", type=int, choices=range(1, 8), default=None, help="Rubric (1-7) for the score range")
+    parser_search.add_argument("--min-score", type=float, default=None, help="Minimum score on --rubric")
+    parser_search.add_argument("--max-score", type=float, default=None, help="Maximum score on --rubric")
+    parser_search.add_argument("--limit", type=int, default=20, help="Max results per scope")
     args = parser.parse_args()
+
+    if args.command == "search" and args.rubric is None and (args.min_score is not None or args.max_score is not None):
+        parser_search.error("--min-score/--max-score require --rubric")
     
     if args.command == "ingest":
         cmd_ingest(args)
@@ -117,6 +161,10 @@ def main():
         cmd_synthesize(args)
     elif args.command == "reset":
         cmd_reset(args)
+    elif args.command == "serve":
+        cmd_serve(args)
+    elif args.command == "search":
+        cmd_search(args)
     else:
         parser.print_help()
 
@@ -1,9 +1,11 @@
 import llm
 import os
 import re
+import time
+import threading
 import hashlib
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Tuple, Optional, Dict, Any
 from pypdf import PdfReader
 import database
 
@@ -75,16 +77,17 @@ def segment_text(text: str, semantic: bool = True) -> List[str]:
         sections.append("\n".join(current_section))
     return sections
 
-def ingest_course(filepath: Path, source: str = "local", semantic: bool = True):
+def ingest_course(filepath: Path, source: str = "local", semantic: bool = True) -> Optional[str]:
+    """Ingest a single PDF. Returns the course id (content hash), or None if no text could be extracted."""
     print(f"Ingesting {filepath.name}...")
     hash_val = compute_file_hash(filepath)
     if database.course_exists(hash_val):
         print(f"Skipping {filepath.name} (already exists).")
-        return 
+        return hash_val
     text = extract_text_from_pdf(filepath)
     if not text:
         print(f"Warning: No text extracted from {filepath.name}")
-        return
+        return None
     database.insert_course(hash_val, filepath.name, str(filepath), source)
     
     # Pass the semantic flag to segment_text
@@ -92,9 +95,58 @@ def ingest_course(filepath: Path, source: str = "local", semantic: bool = True):
     
     print(f"  -> Extracted {len(sections)} sections.")
     database.insert_sections(hash_val, sections)
+    return hash_val
 
 def scan_and_ingest(courses_dir: Path, semantic: bool = True):
     if not courses_dir.exists(): return
     pdfs = sorted(courses_dir.rglob("*.pdf"))
     for pdf in pdfs:
         ingest_course(pdf, source=pdf.parent.name, semantic=semantic)
+
+def evaluate_sections(sections: List[Dict[str, Any]], model_name: str, limit: Optional[int] = None,
+                      stop_event: Optional[threading.Event] = None) -> int:
+    """
+    Evaluate sections one by one and save the results. Returns the number of saved evaluations.
+    Stops between two sections once `stop_event` is set.
+    """
+    count = 0
+    for section in sections:
+        if limit and count >= limit:
+            break
+        if stop_event is not None and stop_event.is_set():
+            print("  -> Stopping, remaining sections are left for the next run.")
+            break
+
+        print(f"Evaluating section {section['id']} of {section['filename']}...")
+        result = llm.evaluate_section(section['content'], preferred_model=model_name)
+
+        if result:
+            database.save_evaluation(section['id'], model_name, result)
+            count += 1
+            print("  -> Saved.")
+        else:
+            print("  -> Failed / Skipped.")
+
+        time.sleep(2)
+    return count
+
+def synthesize_course(course: Dict[str, Any], model_name: str, output_dir: Path = Path("outputs")) -> Optional[Path]:
+    """Synthesize a course report, save it to the DB and to disk. Returns the output path, or None."""
+    print(f"Synthesizing {course['filename']}...")
+    evals = database.get_course_evaluations(course["id"])
+    if not evals:
+        print(f"  -> No evaluations found for {course['filename']}. Skip.")
+        return None
+
+    report = llm.synthesize_course_report(evals, model_name=model_name)
+    if not report:
+        print("  -> Synthesis failed.")
+        return None
+
+    database.save_synthesis(course["id"], model_name, report)
+    # Also save to disk
+    out_path = output_dir / f"{course['filename'].replace('.pdf', '')}_synthesis.md"
+    with open(out_path, "w") as f_out:
+        f_out.write(report)
+    print(f"  -> Saved to DB and {out_path}")
+    return out_path
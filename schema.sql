@@ -34,3 +34,64 @@ CREATE TABLE IF NOT EXISTS evaluations (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY(section_id) REFERENCES sections(id) ON DELETE CASCADE
 );
+
+-- Lookups of a section's evaluations (unevaluated sections, search filters)
+CREATE INDEX IF NOT EXISTS idx_evaluations_section_model ON evaluations(section_id, model_name);
+
+CREATE TABLE IF NOT EXISTS synthesis (
+    course_id TEXT PRIMARY KEY,
+    model_name TEXT,
+    report TEXT,       -- Markdown course synthesis
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Full-text search (FTS5). Kept in sync with the tables above by triggers.
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
+    content,
+    content='sections', content_rowid='id',  -- External content: the text is not stored twice
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS sections_fts_ai AFTER INSERT ON sections BEGIN
+    INSERT INTO sections_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS sections_fts_ad AFTER DELETE ON sections BEGIN
+    INSERT INTO sections_fts(sections_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS sections_fts_au AFTER UPDATE OF content ON sections BEGIN
+    INSERT INTO sections_fts(sections_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO sections_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+-- Findings are stored as JSON, so the index holds their flattened text (rowid = evaluations.id)
+CREATE VIRTUAL TABLE IF NOT EXISTS evaluations_fts USING fts5(
+    issues, fixes, evidence, reasoning,
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS evaluations_fts_ai AFTER INSERT ON evaluations BEGIN
+    INSERT INTO evaluations_fts(rowid, issues, fixes, evidence, reasoning) VALUES (
+        new.id,
+        (SELECT group_concat(value, char(10)) FROM json_each(new.issues)),
+        (SELECT group_concat(value, char(10)) FROM json_each(new.fixes)),
+        (SELECT group_concat(value, char(10)) FROM json_each(new.evidence)),
+        (SELECT group_concat(value, char(10)) FROM json_each(new.reasoning))
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS evaluations_fts_ad AFTER DELETE ON evaluations BEGIN
+    DELETE FROM evaluations_fts WHERE rowid = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS evaluations_fts_au AFTER UPDATE OF issues, fixes, evidence, reasoning ON evaluations BEGIN
+    DELETE FROM evaluations_fts WHERE rowid = old.id;
+    INSERT INTO evaluations_fts(rowid, issues, fixes, evidence, reasoning) VALUES (
+        new.id,
+        (SELECT group_concat(value, char(10)) FROM json_each(new.issues)),
+        (SELECT group_concat(value, char(10)) FROM json_each(new.fixes)),
+        (SELECT group_concat(value, char(10)) FROM json_each(new.evidence)),
+        (SELECT group_concat(value, char(10)) FROM json_each(new.reasoning))
+    );
+END;
@@ -0,0 +1,196 @@
+import itertools
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+RUBRICS = ['rubric1', 'rubric2', 'rubric3', 'rubric4', 'rubric5', 'rubric6', 'rubric7']
+SCORE_MIN, SCORE_MAX = 1, 10
+
+N_BOOT = 10000
+ALPHA = 0.05
+SEED = 42
+
+
+def bootstrap_means(values: np.ndarray, n_boot: int = N_BOOT, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Bootstrap distribution of the mean, all replicates drawn in one operation.
+
+    Resampling n values with replacement is the same as drawing, for each replicate, how many times
+    each distinct value is picked (a multinomial over the distinct values). Rubric scores only take
+    10 values, so this costs (n_boot x 10) instead of (n_boot x n).
+    """
+    rng = rng or np.random.default_rng(SEED)
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.full(n_boot, np.nan)
+    distinct, counts = np.unique(values, return_counts=True)
+    draws = rng.multinomial(values.size, counts / values.size, size=n_boot)
+    return draws @ distinct / values.size
+
+
+def bootstrap_ci(values: np.ndarray, n_boot: int = N_BOOT, alpha: float = ALPHA,
+                 rng: Optional[np.random.Generator] = None) -> Tuple[float, float, float]:
+    """Mean and percentile bootstrap confidence interval: (mean, low, high)."""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.nan, np.nan, np.nan
+    means = bootstrap_means(values, n_boot=n_boot, rng=rng)
+    low, high = np.quantile(means, [alpha / 2, 1 - alpha / 2])
+    return float(values.mean()), float(low), float(high)
+
+
+def bootstrap_score_means(hist: np.ndarray, n_boot: int = N_BOOT,
+                          rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Bootstrap distribution of the mean of several score columns at once, from their histograms.
+
+    `hist` is (n_cols, 10): how many times each score 1-10 appears in each column. The sum of n scores
+    resampled with replacement has the n-fold convolution of the score distribution as its exact law,
+    computed for every column with one batched FFT; the n_boot replicates are then drawn from it in a
+    single multinomial (how many replicates land on each possible sum). The cost grows with n_boot and
+    sqrt(n), not with n_boot x n. Returns an (n_boot x n_cols) array, each column sorted, NaN for empty
+    columns.
+    """
+    rng = rng or np.random.default_rng(SEED)
+    hist = np.asarray(hist, dtype=float)
+    n_cols, k = hist.shape
+    n = hist.sum(axis=1)
+    means = np.full((n_boot, n_cols), np.nan)
+    cols = np.flatnonzero(n > 0)
+    if cols.size == 0:
+        return means
+    p = hist[cols] / n[cols, None]
+    n_used = n[cols]
+
+    # Sums live on 0..(k-1)*n, but by Hoeffding's inequality all but 1e-12 of the mass is within
+    # `half` of the expected sum. Convolving on a circular window of that width is exact up to that mass.
+    support = int((k - 1) * n_used.max()) + 1
+    half = int(np.ceil((k - 1) * np.sqrt(n_used.max() * np.log(2 / 1e-12) / 2)))
+    size = 1 << (min(support, 2 * half + 1) - 1).bit_length()
+    if size >= support:
+        start = np.zeros(cols.size, dtype=int)
+    else:
+        expected = n_used * (p @ np.arange(k))
+        start = np.floor(expected).astype(int) - size // 2
+
+    pmf = np.fft.irfft(np.fft.rfft(p, size, axis=1) ** n_used[:, None], size, axis=1)
+    window = start[:, None] + np.arange(size)
+    pmf = np.take_along_axis(pmf, window % size, axis=1)
+    pmf = np.where(window >= 0, np.clip(pmf, 0, None), 0)
+    pmf /= pmf.sum(axis=1, keepdims=True)
+
+    replicates = rng.multinomial(n_boot, pmf)
+    for idx, col in enumerate(cols):
+        means[:, col] = SCORE_MIN + np.repeat(window[idx], replicates[idx]) / n[col]
+    return means
+
+
+def _sorted_quantiles(sorted_values: np.ndarray, qs: List[float]) -> np.ndarray:
+    """np.quantile (linear interpolation) along axis 0 for columns that are already sorted."""
+    pos = np.asarray(qs) * (len(sorted_values) - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, len(sorted_values) - 1)
+    frac = (pos - lo)[:, None]
+    return sorted_values[lo] * (1 - frac) + sorted_values[hi] * frac
+
+
+def group_confidence_intervals(df: pd.DataFrame, by: List[str], n_boot: int = N_BOOT, alpha: float = ALPHA,
+                               seed: int = SEED) -> pd.DataFrame:
+    """
+    Bootstrap CI of the mean of every rubric, for each group of `by` (e.g. ['filename', 'model_name']).
+
+    Each rubric's CI only depends on that rubric's scores, so it is drawn from the exact distribution of
+    its resampled mean (see bootstrap_score_means), all 7 rubrics of a group in one call. Statistics that
+    combine rubrics (e.g. the boxplot overlay) resample whole evaluations instead.
+    """
+    rng = np.random.default_rng(seed)
+    k = SCORE_MAX - SCORE_MIN + 1
+    rows = []
+    for key, group in df.groupby(by):
+        key = key if isinstance(key, tuple) else (key,)
+        scores = group[RUBRICS].to_numpy(dtype=float)
+        present = ~np.isnan(scores)
+        # Histogram of every rubric in one bincount: rubric j fills bins [j*k, (j+1)*k)
+        bins = (np.rint(scores[present]).astype(int) - SCORE_MIN) + np.nonzero(present)[1] * k
+        hist = np.bincount(bins, minlength=len(RUBRICS) * k).reshape(len(RUBRICS), k)
+        n = hist.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = hist @ np.arange(SCORE_MIN, SCORE_MAX + 1) / n
+        means = bootstrap_score_means(hist, n_boot=n_boot, rng=rng)
+        low, high = _sorted_quantiles(means, [alpha / 2, 1 - alpha / 2])
+        for idx, rubric in enumerate(RUBRICS):
+            rows.append({**dict(zip(by, key)), 'rubric': rubric, 'n': int(n[idx]),
+                         'mean': float(mean[idx]), 'ci_low': float(low[idx]), 'ci_high': float(high[idx])})
+    return pd.DataFrame(rows)
+
+
+def cohen_kappa(a: np.ndarray, b: np.ndarray, weights: Optional[str] = None) -> np.ndarray:
+    """
+    Cohen's kappa between two raters, for every column at once.
+
+    `a` and `b` are (n_items, n_rubrics) integer score matrices. `weights` is None (unweighted)
+    or 'quadratic'. Returns one kappa per column (NaN when undefined, e.g. a single category).
+    """
+    a = np.asarray(a, dtype=int) - SCORE_MIN
+    b = np.asarray(b, dtype=int) - SCORE_MIN
+    k = SCORE_MAX - SCORE_MIN + 1
+    n_items, n_cols = a.shape
+    if n_items == 0:
+        return np.full(n_cols, np.nan)
+
+    # All confusion matrices in one bincount: column c fills cells [c*k*k, (c+1)*k*k)
+    cells = np.arange(n_cols) * k * k + a * k + b
+    observed = np.bincount(cells.ravel(), minlength=n_cols * k * k).reshape(n_cols, k, k) / n_items
+    expected = observed.sum(axis=2)[:, :, None] * observed.sum(axis=1)[:, None, :]
+
+    i, j = np.indices((k, k))
+    if weights == 'quadratic':
+        w = (i - j) ** 2 / (k - 1) ** 2
+    else:
+        w = (i != j).astype(float)
+    disagreement_obs = (w * observed).sum(axis=(1, 2))
+    disagreement_exp = (w * expected).sum(axis=(1, 2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(disagreement_exp > 0, 1 - disagreement_obs / disagreement_exp, np.nan)
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Spearman rank correlation (average ranks for ties), for every column at once."""
+    ra = pd.DataFrame(a).rank(method='average').to_numpy()
+    rb = pd.DataFrame(b).rank(method='average').to_numpy()
+    ra = ra - ra.mean(axis=0)
+    rb = rb - rb.mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (ra * rb).sum(axis=0) / np.sqrt((ra ** 2).sum(axis=0) * (rb ** 2).sum(axis=0))
+
+
+def model_agreement(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-rubric agreement between every pair of models that evaluated the same sections.
+
+    Expects one row per evaluation with `section_id`, `model_name` and the rubric columns.
+    When a model evaluated a section several times, its latest evaluation is used.
+    """
+    if 'evaluation_id' in df.columns:
+        df = df.sort_values('evaluation_id')
+    latest = df.drop_duplicates(['section_id', 'model_name'], keep='last')
+
+    rows = []
+    for model_a, model_b in itertools.combinations(sorted(latest['model_name'].unique()), 2):
+        pairs = latest[latest['model_name'] == model_a].merge(
+            latest[latest['model_name'] == model_b], on='section_id', suffixes=('_a', '_b'))
+        a = pairs[[f"{r}_a" for r in RUBRICS]].to_numpy(dtype=float)
+        b = pairs[[f"{r}_b" for r in RUBRICS]].to_numpy(dtype=float)
+        complete = ~(np.isnan(a).any(axis=1) | np.isnan(b).any(axis=1))
+        a, b = a[complete], b[complete]
+
+        kappa = cohen_kappa(a, b)
+        weighted = cohen_kappa(a, b, weights='quadratic')
+        rho = spearman(a, b) if len(a) > 1 else np.full(len(RUBRICS), np.nan)
+        for idx, rubric in enumerate(RUBRICS):
+            rows.append({'model_a': model_a, 'model_b': model_b, 'rubric': rubric, 'n': len(a),
+                         'kappa': kappa[idx], 'weighted_kappa': weighted[idx], 'spearman': rho[idx]})
+    return pd.DataFrame(rows, columns=['model_a', 'model_b', 'rubric', 'n', 'kappa', 'weighted_kappa', 'spearman'])
@@ -0,0 +1,249 @@
+import queue
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import database
+import pipeline
+import analysis
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# With inotify the directory is still rescanned periodically, in case an event was missed.
+RESCAN_INTERVAL = 60.0
+
+# Sentinel pushed through the queues on shutdown; each stage forwards it downstream.
+# Items still queued at that point are dropped: a restart rescans the directory and resumes them.
+_STOP = None
+
+
+class _WakeHandler(FileSystemEventHandler):
+    """Wakes the scan loop on any filesystem event (inotify via watchdog) instead of waiting for the next poll."""
+
+    def __init__(self, wake: threading.Event):
+        self.wake = wake
+
+    def on_any_event(self, event):
+        if not event.is_directory:
+            self.wake.set()
+
+
+class CourseWatcher:
+    """
+    Streams PDFs from the courses directory through ingest -> evaluate -> report.
+
+    Each stage runs in its own thread and is connected to the next by a bounded queue,
+    so a slow stage (usually the LLM evaluation) blocks the upstream ones instead of
+    piling up work in memory.
+    """
+
+    def __init__(self, courses_dir: Path, model_name: str = "claude", semantic: bool = True,
+                 queue_size: int = 8, poll_interval: float = 5.0, settle: float = 2.0):
+        self.courses_dir = courses_dir
+        self.model_name = model_name
+        self.semantic = semantic
+        self.poll_interval = poll_interval
+        self.settle = settle
+
+        self.ingest_queue: "queue.Queue[Optional[Path]]" = queue.Queue(maxsize=queue_size)
+        self.evaluate_queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=queue_size)
+        self.report_queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=queue_size)
+
+        self.stop_event = threading.Event()
+        self.wake = threading.Event()
+        # pyplot is not thread-safe and a report can run from the evaluate stage on shutdown
+        self._report_lock = threading.Lock()
+        self._seen: Dict[Path, Tuple[float, int]] = {}
+        self._pending: Dict[Path, Tuple[Tuple[float, int], float]] = {}
+        self._workers = [
+            threading.Thread(target=self._ingest_worker, name="ingest", daemon=True),
+            threading.Thread(target=self._evaluate_worker, name="evaluate", daemon=True),
+            threading.Thread(target=self._report_worker, name="report", daemon=True),
+        ]
+
+    # --- Detection -----------------------------------------------------------
+
+    def _snapshot(self) -> Dict[Path, Tuple[float, int]]:
+        snapshot = {}
+        for pdf in self.courses_dir.rglob("*.pdf"):
+            try:
+                stat = pdf.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[pdf] = (stat.st_mtime, stat.st_size)
+        return snapshot
+
+    def scan(self) -> int:
+        """
+        Detect new or changed PDFs and enqueue the ones whose size and mtime have been stable
+        for `settle` seconds (files still being copied are left pending). Returns the number enqueued.
+        """
+        now = time.monotonic()
+        enqueued = 0
+        snapshot = self._snapshot()
+        for gone in [p for p in self._pending if p not in snapshot]:
+            del self._pending[gone]
+        for gone in [p for p in self._seen if p not in snapshot]:
+            del self._seen[gone]
+        for path, signature in snapshot.items():
+            if self._seen.get(path) == signature:
+                continue
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != signature:
+                self._pending[path] = (signature, now)
+                continue
+            if now - pending[1] < self.settle:
+                continue
+            # Blocks while the ingest stage is saturated (backpressure).
+            if not self._put(self.ingest_queue, path):
+                break
+            del self._pending[path]
+            self._seen[path] = signature
+            enqueued += 1
+        return enqueued
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Put into a bounded queue, giving up if shutdown is requested while waiting."""
+        while not self.stop_event.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # --- Stages --------------------------------------------------------------
+
+    def _ingest_worker(self):
+        while True:
+            path = self.ingest_queue.get()
+            if path is _STOP:
+                self.evaluate_queue.put(_STOP)
+                return
+            if self.stop_event.is_set():
+                continue
+            try:
+                if not path.exists():
+                    continue
+                course_id = pipeline.ingest_course(path, source=path.parent.name, semantic=self.semantic)
+                if course_id:
+                    # A changed file gets a new content hash; drop the previous version of it.
+                    for stale in database.get_stale_courses(str(path), course_id):
+                        deleted = database.delete_course(stale["id"])
+                        print(f"  -> Removed previous version of {stale['filename']} ({stale['id'][:8]}) "
+                              f"and its {deleted} evaluation(s).")
+                    self.evaluate_queue.put(course_id)
+            except Exception as e:
+                print(f"Ingest Error ({path.name}): {e}")
+
+    def _evaluate_worker(self):
+        while True:
+            item = self.evaluate_queue.get()
+            if item is _STOP:
+                self.report_queue.put(_STOP)
+                return
+            if self.stop_event.is_set():
+                continue
+            course_id = item
+            try:
+                sections = database.get_unevaluated_sections(self.model_name, course_id=course_id)
+                pipeline.evaluate_sections(sections, self.model_name, stop_event=self.stop_event)
+                # Whether to report comes from the database (evaluations newer than the synthesis), so a
+                # report lost to a shutdown is picked up when the rescan re-enqueues the course on restart.
+                if not database.course_needs_report(course_id):
+                    continue
+                if not self.stop_event.is_set():
+                    self.report_queue.put(course_id)
+                elif not database.get_unevaluated_sections(self.model_name, course_id=course_id):
+                    # Stopped during the last section: the course is complete, report it as part of the item in flight
+                    self._report(course_id)
+            except Exception as e:
+                print(f"Evaluate Error ({course_id[:8]}): {e}")
+
+    def _report_worker(self):
+        while True:
+            course_id = self.report_queue.get()
+            if course_id is _STOP:
+                return
+            if self.stop_event.is_set():
+                continue
+            try:
+                self._report(course_id)
+            except Exception as e:
+                print(f"Report Error ({course_id[:8]}): {e}")
+
+    def _report(self, course_id: str):
+        with self._report_lock:
+            course = database.get_course(course_id)
+            if not course:
+                return
+            analysis.run_course_analysis(course_id)
+            pipeline.synthesize_course(course, self.model_name)
+
+    # --- Lifecycle -----------------------------------------------------------
+
+    def request_stop(self, *_):
+        """Finish the items in flight and exit. A second signal exits immediately."""
+        print("\nShutdown requested, finishing in-flight work (press Ctrl+C again to exit immediately)...")
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self.stop_event.set()
+        self.wake.set()
+
+    def run(self, watch: bool = True):
+        """Run the pipeline. Without `watch`, process the current directory contents once and exit."""
+        for worker in self._workers:
+            worker.start()
+
+        observer = None
+        if watch and Observer is not None:
+            observer = Observer()
+            observer.schedule(_WakeHandler(self.wake), str(self.courses_dir), recursive=True)
+            observer.start()
+            print(f"Watching {self.courses_dir} (inotify)...")
+        elif watch:
+            print(f"Watching {self.courses_dir} (polling every {self.poll_interval}s)...")
+
+        try:
+            while not self.stop_event.is_set():
+                self.scan()
+                if not watch and not self._pending:
+                    break
+                if self._pending:
+                    timeout = self.settle
+                else:
+                    timeout = self.poll_interval if observer is None else RESCAN_INTERVAL
+                self.wake.wait(timeout=timeout)
+                self.wake.clear()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            # Unconditional put: the ingest worker keeps consuming (skipping items once stopped), so this only waits for room.
+            self.ingest_queue.put(_STOP)
+            for worker in self._workers:
+                worker.join()
+            print("Pipeline stopped.")
+
+
+def serve(courses_dir: Path, watch: bool = True, **kwargs):
+    # Charts are rendered from a worker thread, so never pick an interactive backend.
+    import matplotlib
+    matplotlib.use("Agg")
+
+    database.init_db()
+    if not courses_dir.exists():
+        print(f"Courses directory {courses_dir} does not exist.")
+        return
+
+    watcher = CourseWatcher(courses_dir, **kwargs)
+    signal.signal(signal.SIGINT, watcher.request_stop)
+    signal.signal(signal.SIGTERM, watcher.request_stop)
+    watcher.run(watch=watch)